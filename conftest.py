@@ -0,0 +1,55 @@
+"""
+Shared test helpers: recorded ESPN payloads in fixtures/ and stubs that
+serve them in place of the network
+"""
+
+import asyncio
+import json
+import os
+
+import pytest
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def read_fixture_text(name):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return f.read()
+
+
+def load_scoreboard_fixture(league):
+    return json.loads(read_fixture_text(f"{league}_scoreboard.json"))
+
+
+@pytest.fixture
+def read_fixture():
+    """Raw text of a file in fixtures/"""
+    return read_fixture_text
+
+
+@pytest.fixture
+def load_scoreboard():
+    """Recorded scoreboard payload for a league, e.g. 'nfl'"""
+    return load_scoreboard_fixture
+
+
+@pytest.fixture
+def stub_scoreboards():
+    """
+    Replace an engine's download_scoreboard with the recorded fixtures.
+    Returns the list of (sport, league, dates) calls it receives.
+    """
+
+    def stub(engine, delay=0.0):
+        calls = []
+
+        async def recorded_scoreboard(sport, league, dates=None):
+            calls.append((sport, league, dates))
+            if delay:
+                await asyncio.sleep(delay)
+            return load_scoreboard_fixture(league)
+
+        engine.download_scoreboard = recorded_scoreboard
+        return calls
+
+    return stub
@@ -5,17 +5,1122 @@ date: 2024-05-28
 version: 1.0
 license: MIT
 description: Track live scores for Duke, UNC, USC Gamecocks, Clemson, Panthers, Jaguars, Bears, Falcons
-requirements: aiohttp
+requirements: aiohttp, tzdata
 """
 
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+
 import aiohttp
-from typing import Dict, List, Optional, Generator
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from typing import Any, Iterator, Awaitable, Callable, Dict, List, Optional, Generator, Tuple
 from pydantic import BaseModel, Field
 
 
+def approx_size(obj: Any, _seen: Optional[set] = None) -> int:
+    """Rough deep size in bytes of a cached value built from dicts, lists, tuples and scalars"""
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(approx_size(k, seen) + approx_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, deque)):
+        size += sum(approx_size(item, seen) for item in obj)
+    return size
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes, or None where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class MemoryBudget:
+    """
+    One byte budget shared by every in-process cache.
+
+    Caches register the dict holding their entries, report each entry's
+    value through `track` and each read through `touch`; once the total goes
+    over `limit`, the least recently used entries are evicted from whichever
+    cache holds them.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self.evictions = 0
+        # (cache name, key) -> size in bytes, least recently used first
+        self._sizes: "OrderedDict[Tuple[str, Any], int]" = OrderedDict()
+        self._stores: Dict[str, Dict] = {}
+
+    def register(self, name: str, store: Dict) -> None:
+        self.clear(name)
+        self._stores[name] = store
+
+    def track(self, name: str, key: Any, value: Any) -> None:
+        """Record (or re-measure) an entry after it is stored or grows"""
+        entry = (name, key)
+        self.used -= self._sizes.pop(entry, 0)
+        size = approx_size(value)
+        self._sizes[entry] = size
+        self.used += size
+        self._evict(keep=entry)
+
+    def touch(self, name: str, key: Any) -> None:
+        entry = (name, key)
+        if entry in self._sizes:
+            self._sizes.move_to_end(entry)
+
+    def clear(self, name: str) -> None:
+        """Forget every entry of a cache that was emptied or replaced"""
+        for entry in [entry for entry in self._sizes if entry[0] == name]:
+            self.used -= self._sizes.pop(entry)
+
+    def set_limit(self, limit: int) -> None:
+        """Change the budget; the most recently used entry is kept, as in `track`"""
+        self.limit = limit
+        self._evict(keep=next(reversed(self._sizes), None))
+
+    def _evict(self, keep: Optional[Tuple[str, Any]] = None) -> None:
+        # The entry just stored is never evicted, so one larger than the whole
+        # budget (say a live game's detail and cursor) survives until something
+        # newer is stored instead of being dropped and rebuilt on every refresh
+        while self.used > self.limit and self._sizes:
+            if next(iter(self._sizes)) == keep:
+                break
+            (name, key), size = self._sizes.popitem(last=False)
+            self.used -= size
+            self._stores.get(name, {}).pop(key, None)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        per_cache: Dict[str, int] = {name: 0 for name in self._stores}
+        for (name, _), size in self._sizes.items():
+            per_cache[name] = per_cache.get(name, 0) + size
+        return {
+            'budget_bytes': self.limit,
+            'used_bytes': self.used,
+            'entries': len(self._sizes),
+            'evictions': self.evictions,
+            'caches': per_cache,
+        }
+
+
+# Lease owner recorded when a refresh fails, see SharedScoreboardCache._record_failure
+FAILED_LEASE = "failed"
+
+# Snapshots not refreshed for this many TTLs (and at least an hour) are deleted,
+# so keys for past schedule windows don't pile up in the shared file
+SNAPSHOT_RETENTION_TTLS = 100
+MIN_SNAPSHOT_RETENTION = 3600
+
+
+class SharedScoreboardCache:
+    """
+    Cross-process scoreboard cache backed by SQLite in WAL mode.
+
+    Every uvicorn worker opens the same database file. Readers never take a
+    write lock, and only the worker holding the refresh lease for a league
+    fetches from ESPN; everyone else reads the parsed snapshot it stored.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = 30.0,
+        lease: float = 15.0,
+        wait: float = 5.0,
+        retry_after: float = 10.0,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.lease = lease
+        self.wait = wait
+        self.retry_after = retry_after
+        self.stats = {'hits': 0, 'stale': 0, 'refreshes': 0, 'waits': 0}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        # key -> (version, games) so unchanged snapshots are not decoded twice
+        self._decoded: Dict[str, Tuple[int, List[Dict]]] = {}
+        self.budget: Optional[MemoryBudget] = None
+
+    def attach_budget(self, budget: MemoryBudget) -> None:
+        """Count decoded snapshots against a shared in-process memory budget"""
+        self.budget = budget
+        budget.register('shared', self._decoded)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so reopen when the pid changes
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.lease, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                "key TEXT PRIMARY KEY, version INTEGER NOT NULL, fetched_at REAL NOT NULL, games TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                "key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn = conn
+            self._pid = os.getpid()
+            self._decoded.clear()
+            if self.budget is not None:
+                self.budget.clear('shared')
+        return self._conn
+
+    def _read(self, key: str) -> Optional[Tuple[float, List[Dict]]]:
+        """Return (fetched_at, games) for a key, or None if nothing is stored"""
+        row = self._connect().execute(
+            "SELECT version, fetched_at, games FROM snapshots WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        version, fetched_at, payload = row
+        cached = self._decoded.get(key)
+        if cached is None or cached[0] != version:
+            cached = (version, json.loads(payload))
+            self._decoded[key] = cached
+            if self.budget is not None:
+                self.budget.track('shared', key, cached)
+        elif self.budget is not None:
+            self.budget.touch('shared', key)
+        return fetched_at, cached[1]
+
+    def _write(self, key: str, games: List[Dict]) -> None:
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO snapshots (key, version, fetched_at, games) VALUES (?, 1, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET version = snapshots.version + 1, "
+            "fetched_at = excluded.fetched_at, games = excluded.games",
+            (key, now, json.dumps(games)),
+        )
+        self._prune(conn, now)
+
+    def _prune(self, conn: sqlite3.Connection, now: float) -> None:
+        """Delete snapshots and lease markers nobody has refreshed within the retention period"""
+        cutoff = now - max(self.ttl * SNAPSHOT_RETENTION_TTLS, MIN_SNAPSHOT_RETENTION)
+        conn.execute("DELETE FROM snapshots WHERE fetched_at < ?", (cutoff,))
+        conn.execute("DELETE FROM leases WHERE expires_at < ?", (cutoff,))
+
+    def _acquire(self, key: str) -> Optional[str]:
+        """
+        Try to become the refresher for a key, returning the lease token on success.
+        Each call gets its own token, so two callers in one process never share a
+        lease; a single UPSERT keeps this atomic.
+        """
+        token = uuid.uuid4().hex
+        now = time.time()
+        cursor = self._connect().execute(
+            "INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE leases.expires_at < ?",
+            (key, token, now + self.lease, now),
+        )
+        return token if cursor.rowcount == 1 else None
+
+    def _release(self, key: str, token: str) -> None:
+        self._connect().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, token))
+
+    def _record_failure(self, key: str, token: str) -> None:
+        """Hold the lease as a failure marker so nobody retries ESPN before `retry_after`"""
+        self._connect().execute(
+            "UPDATE leases SET owner = ?, expires_at = ? WHERE key = ? AND owner = ?",
+            (FAILED_LEASE, time.time() + self.retry_after, key, token),
+        )
+
+    def _failed(self, key: str) -> bool:
+        row = self._connect().execute(
+            "SELECT owner FROM leases WHERE key = ? AND expires_at >= ?", (key, time.time())
+        ).fetchone()
+        return row is not None and row[0] == FAILED_LEASE
+
+    def _key(self, sport: str, league: str, dates: Optional[str] = None) -> str:
+        return f"{sport}/{league}/{dates}" if dates else f"{sport}/{league}"
+
+    def peek(self, sport: str, league: str, dates: Optional[str] = None) -> Optional[List[Dict]]:
+        """Return the stored games for a league regardless of age, without fetching"""
+        snapshot = self._read(self._key(sport, league, dates))
+        return snapshot[1] if snapshot else None
+
+    def _is_fresh(self, snapshot: Optional[Tuple[float, List[Dict]]]) -> bool:
+        return snapshot is not None and time.time() - snapshot[0] < self.ttl
+
+    async def get(
+        self,
+        sport: str,
+        league: str,
+        fetch: Callable[[str, str, Optional[str]], Awaitable[Optional[List[Dict]]]],
+        dates: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        Return the parsed games for a league (and optional ESPN `dates` window),
+        refreshing through `fetch` only when this worker wins the refresh lease.
+        `fetch` returns None on failure, in which case nothing is stored.
+        """
+        key = self._key(sport, league, dates)
+        snapshot = self._read(key)
+        if self._is_fresh(snapshot):
+            self.stats['hits'] += 1
+            return snapshot[1]
+
+        token = self._acquire(key)
+        if token is not None:
+            return await self._refresh(key, token, snapshot, lambda: fetch(sport, league, dates))
+
+        # Someone else is refreshing: serve what we have, or wait for their snapshot
+        if snapshot is not None:
+            self.stats['stale'] += 1
+            return snapshot[1]
+
+        self.stats['waits'] += 1
+        deadline = time.time() + self.wait
+        while time.time() < deadline:
+            await asyncio.sleep(0.05)
+            snapshot = self._read(key)
+            if snapshot is not None:
+                return snapshot[1]
+            if self._failed(key):
+                # The refresher couldn't reach ESPN; don't all retry at once
+                return []
+
+        # The refresher is slow or gone: take over only if its lease has lapsed
+        token = self._acquire(key)
+        if token is not None:
+            return await self._refresh(key, token, self._read(key), lambda: fetch(sport, league, dates))
+        return []
+
+    async def _refresh(
+        self,
+        key: str,
+        token: str,
+        snapshot: Optional[Tuple[float, List[Dict]]],
+        fetch: Callable[[], Awaitable[Optional[List[Dict]]]],
+    ) -> List[Dict]:
+        """Fetch and store a key while holding its lease"""
+        failed = False
+        try:
+            # Another worker may have refreshed between our read and the lease
+            latest = self._read(key)
+            if self._is_fresh(latest):
+                self.stats['hits'] += 1
+                return latest[1]
+            games = await fetch()
+            if games is None:
+                failed = True
+                self._record_failure(key, token)
+                snapshot = latest or snapshot
+                return snapshot[1] if snapshot else []
+            self._write(key, games)
+            self.stats['refreshes'] += 1
+            return games
+        finally:
+            if not failed:
+                self._release(key, token)
+
+
+# Tracked teams, keyed by ESPN team ID
+COLLEGE_TEAMS = {
+    150: "Duke Blue Devils",
+    153: "UNC Tar Heels",
+    2579: "USC Gamecocks",
+    228: "Clemson Tigers"
+}
+
+COLLEGE_TEAM_ABBREVIATIONS = {
+    150: "DUKE",
+    153: "UNC",
+    2579: "USC",
+    228: "CLEM"
+}
+
+NFL_TEAMS = {
+    29: "Carolina Panthers",
+    30: "Jacksonville Jaguars",
+    3: "Chicago Bears",
+    1: "Atlanta Falcons"
+}
+
+NFL_TEAM_ABBREVIATIONS = {
+    29: "CAR",
+    30: "JAX",
+    3: "CHI",
+    1: "ATL"
+}
+
+# Names users can type for each team
+TEAM_LOOKUP = {
+    'duke': 150, 'unc': 153, 'usc': 2579, 'clemson': 228,
+    'panthers': 29, 'carolina': 29, 'jaguars': 30, 'jacksonville': 30,
+    'bears': 3, 'chicago': 3, 'falcons': 1, 'atlanta': 1
+}
+
+# sport option -> (sport, league, display title)
+LEAGUES = {
+    'basketball': ("basketball", "mens-college-basketball", "🏀 **COLLEGE BASKETBALL** 🏀"),
+    'football': ("football", "college-football", "🏈 **COLLEGE FOOTBALL** 🏈"),
+    'nfl': ("football", "nfl", "🏈 **NFL** 🏈"),
+}
+
+ESPN_BASE_URL = "https://site.api.espn.com/apis/site/v2/sports"
+
+# ESPN reads scoreboard `dates` as US Eastern days, whatever the server's timezone
+ESPN_TIMEZONE = ZoneInfo("America/New_York")
+
+# Upper bound on events returned for a date-window scoreboard request
+SCOREBOARD_LIMIT = 500
+
+# Default byte budget shared by all in-process caches
+DEFAULT_MEMORY_BUDGET = 32 * 1024 * 1024
+
+# Payload keys kept when decoding ESPN responses; everything else is dropped while
+# parsing, so unused subtrees (logos, links, odds, leaders, news...) are never held.
+# Scoreboards keep what format_game_info reads.
+SCOREBOARD_FIELDS = frozenset({
+    'events', 'id', 'name', 'date', 'status', 'type', 'state', 'detail', 'shortDetail',
+    'competitions', 'competitors', 'homeAway', 'team', 'displayName', 'abbreviation',
+    'score', 'records', 'summary', 'venue', 'fullName', 'broadcasts', 'names',
+})
+
+# Summaries keep what format_play and format_boxscore read
+SUMMARY_FIELDS = frozenset({
+    'boxscore', 'teams', 'team', 'abbreviation', 'statistics', 'label', 'name', 'displayValue',
+    'drives', 'previous', 'current', 'id', 'plays', 'sequenceNumber', 'text',
+    'awayScore', 'homeScore', 'period', 'number', 'clock', 'scoringPlay',
+})
+
+# Plays kept in memory per live game, oldest dropped first
+MAX_STORED_PLAYS = 200
+
+# Seconds a live game's play-by-play is served from memory before refreshing
+DETAIL_TTL = 15
+
+# One scoreboard request: (sport, league, ESPN `dates` window or None for today)
+FetchKey = Tuple[str, str, Optional[str]]
+
+
+class ScoreEngine:
+    """
+    Core engine shared by the `Tools` entry point in main.py and the `Pipe` below.
+
+    Layers, from the network up:
+      fetch   - download_scoreboard / fetch_games (optionally via SharedScoreboardCache)
+      parse   - filter_team_games / format_game_info build the game dicts
+      render  - render_games / render_schedule / render_team_info produce chat text
+    """
+
+    def __init__(
+        self,
+        timeout: float = 10,
+        cache: Optional[SharedScoreboardCache] = None,
+        ttl: float = 30,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    ):
+        self.timeout = timeout
+        self.ttl = ttl
+        self.budget = MemoryBudget(memory_budget)
+        self.cache = cache
+        if cache is not None:
+            cache.attach_budget(self.budget)
+
+        self.college_teams = COLLEGE_TEAMS
+        self.nfl_teams = NFL_TEAMS
+        self.all_teams = {**COLLEGE_TEAMS, **NFL_TEAMS}
+        self.abbreviations = {**COLLEGE_TEAM_ABBREVIATIONS, **NFL_TEAM_ABBREVIATIONS}
+        self.team_lookup = TEAM_LOOKUP
+        self.tracked_ids = set(str(tid) for tid in self.all_teams.keys())
+
+        # (sport, league, dates) -> fetch already running, shared by concurrent callers
+        self._inflight: Dict[FetchKey, asyncio.Future] = {}
+        # (sport, league, dates) -> (fetched_at, games), used when there is no shared cache
+        self._snapshots: Dict[FetchKey, Tuple[float, List[Dict]]] = {}
+        # event id -> play-by-play and box score for a live game, see fetch_game_detail
+        self._details: Dict[str, Dict[str, Any]] = {}
+        self.detail_ttl = DETAIL_TTL
+        self.budget.register('snapshots', self._snapshots)
+        self.budget.register('details', self._details)
+
+    # Fetch layer
+
+    async def fetch_text(self, url: str, params: Optional[Dict] = None) -> Optional[str]:
+        """GET an ESPN URL and return the body, or None on a non-200 response"""
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.get(url, params=params) as response:
+                if response.status == 200:
+                    return await response.text()
+                return None
+
+    def decode_payload(self, text: str, fields: frozenset) -> Dict:
+        """Decode an ESPN JSON body, dropping every key not in `fields` as it is parsed"""
+        return json.loads(text, object_hook=lambda obj: {k: v for k, v in obj.items() if k in fields})
+
+    async def download_scoreboard(self, sport: str, league: str, dates: Optional[str] = None) -> Optional[Dict]:
+        """Download an ESPN scoreboard trimmed to SCOREBOARD_FIELDS, returning None on failure"""
+        url = f"{ESPN_BASE_URL}/{sport}/{league}/scoreboard"
+        params = {'dates': dates, 'limit': SCOREBOARD_LIMIT} if dates else None
+
+        try:
+            text = await self.fetch_text(url, params)
+            return self.decode_payload(text, SCOREBOARD_FIELDS) if text is not None else None
+        except Exception as e:
+            print(f"Error fetching {sport}/{league} scoreboard: {e}")
+            return None
+
+    async def download_games(self, sport: str, league: str, dates: Optional[str] = None) -> Optional[List[Dict]]:
+        """Download and parse tracked games for a league, returning None on failure"""
+        data = await self.download_scoreboard(sport, league, dates)
+        if data is None:
+            return None
+        return self.filter_team_games(data)
+
+    async def fetch_games(self, sport: str, league: str, dates: Optional[str] = None) -> List[Dict]:
+        """
+        Get tracked games for a league, going through the shared cache when set.
+        Concurrent callers asking for the same fetch share one request.
+        """
+        key = (sport, league, dates)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        task = asyncio.ensure_future(self._fetch_games(sport, league, dates))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch_games(self, sport: str, league: str, dates: Optional[str]) -> List[Dict]:
+        if self.cache is not None:
+            try:
+                return await self.cache.get(sport, league, self.download_games, dates)
+            except sqlite3.Error as e:
+                print(f"Shared cache unavailable, fetching directly: {e}")
+
+        key = (sport, league, dates)
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None and time.time() - snapshot[0] < self.ttl:
+            self.budget.touch('snapshots', key)
+            return snapshot[1]
+
+        games = await self.download_games(sport, league, dates)
+        if games is None:
+            return snapshot[1] if snapshot else []
+        self._snapshots[key] = (time.time(), games)
+        self.budget.track('snapshots', key, self._snapshots[key])
+        return games
+
+    def known_games(self, sport: str, league: str, dates: Optional[str] = None) -> Optional[List[Dict]]:
+        """Games last seen for a league, however old, without fetching"""
+        if self.cache is not None:
+            try:
+                return self.cache.peek(sport, league, dates)
+            except sqlite3.Error:
+                return None
+        snapshot = self._snapshots.get((sport, league, dates))
+        return snapshot[1] if snapshot else None
+
+    def _has_live_games(self, sport: str, league: str) -> bool:
+        games = self.known_games(sport, league) or []
+        return any(game['status']['state'] == 'in' for game in games)
+
+    # Warm-up
+
+    async def warm_up(self, schedule_days: int = 7, should_continue: Callable[[], bool] = lambda: True) -> List[FetchKey]:
+        """
+        Prefetch today's scoreboards, then the schedule window for every tracked
+        team. Leagues with games in progress are fetched first. Stops early once
+        `should_continue` returns False. Returns the fetches made, in order.
+        """
+        warmed = []
+        leagues = [(sport, league) for sport, league, _ in LEAGUES.values()]
+        # Last known state decides the first pass; today's fetch decides the second
+        leagues.sort(key=lambda sl: not self._has_live_games(*sl))
+
+        for sport, league in leagues:
+            if not should_continue():
+                return warmed
+            await self.fetch_games(sport, league)
+            warmed.append((sport, league, None))
+
+        dates = self.schedule_window(schedule_days)
+        tracked = list(dict.fromkeys(sl for tid in self.all_teams for sl in self.leagues_for_team(tid)))
+        tracked.sort(key=lambda sl: not self._has_live_games(*sl))
+
+        for sport, league in tracked:
+            if not should_continue():
+                return warmed
+            await self.fetch_games(sport, league, dates)
+            warmed.append((sport, league, dates))
+
+        return warmed
+
+    def start_warm_up(
+        self,
+        schedule_days: int = 7,
+        should_continue: Callable[[], bool] = lambda: True,
+        prepare: Optional[Callable[[], Optional[int]]] = None,
+    ) -> Optional[asyncio.Task]:
+        """
+        Run warm_up in the background, or return None when no event loop is
+        running. `prepare`, if given, is called when the task starts and
+        returns the schedule days to use, or None to skip the warm-up.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+
+        async def run():
+            try:
+                days = schedule_days if prepare is None else prepare()
+                if days is None:
+                    return
+                await self.warm_up(days, should_continue)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Warm-up failed: {e}")
+
+        return loop.create_task(run())
+
+    # Parse layer
+
+    def filter_team_games(self, data: Dict) -> List[Dict]:
+        """Filter a scoreboard payload down to games involving tracked teams"""
+        team_games = []
+
+        for event in data.get('events', []):
+            for competition in event.get('competitions', []):
+                competitors = competition.get('competitors', [])
+
+                # Check if any tracked teams are playing
+                for competitor in competitors:
+                    if competitor.get('team', {}).get('id') in self.tracked_ids:
+                        game_info = self.format_game_info(event, competition)
+                        if game_info:
+                            team_games.append(game_info)
+                        break
+
+        return team_games
+
+    def format_game_info(self, event: Dict, competition: Dict) -> Optional[Dict]:
+        """
+        Build the game dict every other layer works with:
+        id, name, date, status{type, state, detail, short_detail},
+        home_team/away_team{id, name, abbreviation, score, record}, venue, broadcast
+        """
+        try:
+            status = event.get('status', {})
+            competitors = competition.get('competitors', [])
+
+            if len(competitors) != 2:
+                return None
+
+            home_team = next((c for c in competitors if c.get('homeAway') == 'home'), competitors[0])
+            away_team = next((c for c in competitors if c.get('homeAway') == 'away'), competitors[1])
+
+            return {
+                'id': event.get('id'),
+                'name': event.get('name', ''),
+                'date': event.get('date'),
+                'status': {
+                    'type': status.get('type', {}).get('name', 'Unknown'),
+                    'state': status.get('type', {}).get('state', 'Unknown'),
+                    'detail': status.get('type', {}).get('detail', ''),
+                    'short_detail': status.get('type', {}).get('shortDetail', '')
+                },
+                'home_team': self._format_competitor(home_team),
+                'away_team': self._format_competitor(away_team),
+                'venue': competition.get('venue', {}).get('fullName', ''),
+                'broadcast': ', '.join([b.get('names', [''])[0] for b in competition.get('broadcasts', [])])
+            }
+        except Exception as e:
+            print(f"Error formatting game info: {e}")
+            return None
+
+    def _format_competitor(self, competitor: Dict) -> Dict:
+        records = competitor.get('records')
+        return {
+            'id': competitor['team']['id'],
+            'name': competitor['team']['displayName'],
+            'abbreviation': competitor['team']['abbreviation'],
+            'score': competitor.get('score', '0'),
+            'record': records[0].get('summary', '') if records else ''
+        }
+
+    # Render layer
+
+    def render_games(self, games: List[Dict]) -> str:
+        """Render a list of games as chat text"""
+        if not games:
+            return "No games found."
+
+        output = []
+        for game in games:
+            home = game['home_team']
+            away = game['away_team']
+            status = game['status']
+
+            # Mark which tracked teams are playing
+            our_teams = [team['abbreviation'] for team in (home, away) if team['id'] in self.tracked_ids]
+            teams_indicator = f" 📍 {', '.join(our_teams)}" if our_teams else ""
+
+            # Format score/matchup
+            if status['state'] in ['in', 'post']:
+                matchup = f"**{away['abbreviation']} {away['score']} - {home['score']} {home['abbreviation']}**"
+            else:
+                matchup = f"**{away['abbreviation']} @ {home['abbreviation']}**"
+
+            output.append(f"{matchup}{teams_indicator}\n{self._render_details(game)}")
+
+        return "\n\n".join(output)
+
+    def render_schedule(self, team_id: int, games: List[Dict]) -> str:
+        """Render a team's games, each tagged with 'sport' and 'league', in date order"""
+        team_name = self.all_teams[team_id]
+        if not games:
+            return f"No upcoming games found for {team_name}"
+
+        output = [f"📅 **{team_name.upper()} SCHEDULE** 📅\n"]
+        for game in sorted(games, key=lambda g: g.get('date') or ''):
+            sport_emoji = "🏀" if game['sport'] == "basketball" else "🏈"
+            league_label = ""
+            if game.get('league') == 'nfl':
+                league_label = " (NFL)"
+            elif game.get('league') == 'college-football':
+                league_label = " (College)"
+
+            home = game['home_team']
+            away = game['away_team']
+
+            if home['id'] == str(team_id):
+                opponent = f"vs {away['abbreviation']}"
+                location = "Home"
+            else:
+                opponent = f"@ {home['abbreviation']}"
+                location = "Away"
+
+            output.append(f"{sport_emoji} **{opponent}** ({location}){league_label}\n{self._render_details(game)}\n")
+
+        return "\n".join(output)
+
+    def _render_details(self, game: Dict) -> str:
+        status = game['status']
+        status_text = status.get('short_detail') or status.get('detail') or 'TBD'
+        details = f"📅 {status_text}\n🏟️ {game.get('venue') or 'TBD'}"
+        if game.get('broadcast'):
+            details += f"\n📺 {game['broadcast']}"
+        return details
+
+    def render_team_info(self) -> str:
+        """Render the list of tracked teams"""
+        output = ["🏀🏈 **TRACKED TEAMS** 🏈🏀\n"]
+
+        output.append("**College Teams:**")
+        for team_id, team_name in self.college_teams.items():
+            output.append(f"• **{team_name}** ({self.abbreviations[team_id]}) - ID: {team_id}")
+
+        output.append("\n**NFL Teams:**")
+        for team_id, team_name in self.nfl_teams.items():
+            output.append(f"• **{team_name}** ({self.abbreviations[team_id]}) - ID: {team_id}")
+
+        return "\n".join(output)
+
+    # Live game detail
+
+    async def download_summary(self, sport: str, league: str, event_id: str) -> Optional[Dict]:
+        """Download an ESPN event summary trimmed to SUMMARY_FIELDS, returning None on failure"""
+        url = f"{ESPN_BASE_URL}/{sport}/{league}/summary"
+
+        try:
+            text = await self.fetch_text(url, {'event': event_id})
+            return self.decode_payload(text, SUMMARY_FIELDS) if text is not None else None
+        except Exception as e:
+            print(f"Error fetching summary for event {event_id}: {e}")
+            return None
+
+    async def fetch_game_detail(self, sport: str, league: str, event_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the stored detail for a live game, refreshing it once it is older
+        than `detail_ttl`. The summary endpoint always returns the whole game,
+        so only plays past the event's cursor are parsed and stored.
+
+        Detail is {'cursor', 'plays', 'plays_parsed', 'boxscore', 'fetched_at'}.
+        """
+        detail = self._details.get(event_id)
+        if detail is not None and time.time() - detail['fetched_at'] < self.detail_ttl:
+            self.budget.touch('details', event_id)
+            return detail
+
+        data = await self.download_summary(sport, league, event_id)
+        if data is None:
+            return detail
+
+        if detail is None:
+            detail = {
+                'cursor': -1,
+                'plays': deque(maxlen=MAX_STORED_PLAYS),
+                'plays_parsed': 0,
+                'boxscore': [],
+                'fetched_at': 0.0,
+            }
+        self.parse_new_plays(detail, data)
+        detail['boxscore'] = self.format_boxscore(data)
+        detail['fetched_at'] = time.time()
+        # Re-measured on every refresh since the play list grows in place
+        self._details[event_id] = detail
+        self.budget.track('details', event_id, detail)
+        return detail
+
+    def parse_new_plays(self, detail: Dict[str, Any], data: Dict) -> int:
+        """Append plays newer than the detail's cursor, returning how many were added"""
+        cursor = detail['cursor']
+        limit = getattr(detail['plays'], 'maxlen', None) or MAX_STORED_PLAYS
+        new_plays = []
+
+        # Walk newest first and stop at the cursor, so earlier plays are never revisited,
+        # or once the store is full, since anything older would be dropped straight away
+        for play in self._iter_plays_newest_first(data):
+            sequence = int(play.get('sequenceNumber') or 0)
+            if sequence <= cursor or len(new_plays) >= limit:
+                break
+            new_plays.append(self.format_play(play, sequence))
+
+        new_plays.reverse()
+        detail['plays'].extend(new_plays)
+        detail['plays_parsed'] += len(new_plays)
+        if new_plays:
+            detail['cursor'] = new_plays[-1]['sequence']
+        return len(new_plays)
+
+    def _iter_plays_newest_first(self, data: Dict) -> Iterator[Dict]:
+        # Football nests plays under drives; other sports list them flat
+        drives = data.get('drives')
+        if drives:
+            groups = list(drives.get('previous', []))
+            current = drives.get('current')
+            if current and (not groups or groups[-1].get('id') != current.get('id')):
+                groups.append(current)
+            for drive in reversed(groups):
+                yield from reversed(drive.get('plays', []))
+        else:
+            yield from reversed(data.get('plays', []))
+
+    def format_play(self, play: Dict, sequence: int) -> Dict:
+        """Keep just the play fields the detail view shows"""
+        period = play.get('period', {})
+        return {
+            'sequence': sequence,
+            'text': play.get('text', ''),
+            'period': period.get('displayValue') or str(period.get('number', '')),
+            'clock': play.get('clock', {}).get('displayValue', ''),
+            'away_score': play.get('awayScore'),
+            'home_score': play.get('homeScore'),
+            'scoring': bool(play.get('scoringPlay'))
+        }
+
+    def format_boxscore(self, data: Dict) -> List[Dict]:
+        """Team box score lines: [{'abbreviation', 'stats': [(label, value), ...]}]"""
+        return [
+            {
+                'abbreviation': team.get('team', {}).get('abbreviation', ''),
+                'stats': [
+                    (stat.get('label') or stat.get('name', ''), stat.get('displayValue', ''))
+                    for stat in team.get('statistics', [])
+                ]
+            }
+            for team in data.get('boxscore', {}).get('teams', [])
+        ]
+
+    def render_game_detail(self, game: Dict, detail: Dict[str, Any], plays: int = 10) -> str:
+        """Render the score line, box score and last `plays` plays of a live game"""
+        home = game['home_team']
+        away = game['away_team']
+        status = game['status'].get('short_detail') or game['status'].get('detail', '')
+        output = [f"📋 **{away['abbreviation']} {away['score']} - {home['score']} {home['abbreviation']}** ({status})"]
+
+        if detail['boxscore']:
+            output.append("\n**Box Score**")
+            for team in detail['boxscore']:
+                stats = " · ".join(f"{label} {value}" for label, value in team['stats'][:6])
+                output.append(f"• **{team['abbreviation']}**: {stats}")
+
+        recent = list(detail['plays'])[-plays:] if plays > 0 else []
+        if recent:
+            output.append(f"\n**Last {len(recent)} Plays**")
+            for play in reversed(recent):
+                marker = "🔥 " if play['scoring'] else ""
+                score = ""
+                if play['away_score'] is not None:
+                    score = f" ({away['abbreviation']} {play['away_score']} - {play['home_score']} {home['abbreviation']})"
+                output.append(f"• {marker}{play['period']} {play['clock']} - {play['text']}{score}")
+
+        return "\n".join(output)
+
+    async def game_detail(self, team: str, plays: int = 10) -> str:
+        """Box score and last `plays` plays for a tracked team's game in progress"""
+        try:
+            team_id = self.team_lookup.get(team.lower())
+            if not team_id:
+                return f"Team '{team}' not found. Available: {', '.join(self.team_lookup.keys())}"
+
+            for sport, league in self.leagues_for_team(team_id):
+                for game in await self.fetch_games(sport, league):
+                    if (str(team_id) in (game['home_team']['id'], game['away_team']['id']) and
+                            game['status']['state'] == 'in'):
+                        detail = await self.fetch_game_detail(sport, league, game['id'])
+                        if detail is None:
+                            return f"Couldn't load game detail for {self.all_teams[team_id]} right now."
+                        return self.render_game_detail(game, detail, plays)
+
+            return f"No {self.all_teams[team_id]} game in progress right now."
+
+        except Exception as e:
+            return f"Error fetching game detail: {str(e)}"
+
+    # Memory gauges
+
+    def memory_stats(self) -> Dict[str, Any]:
+        """Budget usage per in-process cache, evictions and process RSS"""
+        stats = self.budget.stats()
+        stats['rss_bytes'] = current_rss()
+        return stats
+
+    def render_memory_stats(self) -> str:
+        stats = self.memory_stats()
+        mb = 1024 * 1024
+        output = ["🧠 **MEMORY** 🧠\n"]
+        output.append(f"• Cache budget: {stats['used_bytes'] / mb:.2f} / {stats['budget_bytes'] / mb:.2f} MB "
+                      f"({stats['entries']} entries, {stats['evictions']} evicted)")
+        for name, used in stats['caches'].items():
+            output.append(f"• {name}: {used / 1024:.1f} KB")
+        if stats['rss_bytes'] is not None:
+            output.append(f"• Process RSS: {stats['rss_bytes'] / mb:.1f} MB")
+        return "\n".join(output)
+
+    # Queries used by both entry points
+
+    async def live_scores(self, sport: str = "both") -> str:
+        """Live scores for tracked teams in 'basketball', 'football', 'nfl' or 'both'"""
+        result = await self.answer_batch([{'type': 'live_scores', 'sport': sport}])
+        return result['answers'][0]
+
+    async def team_schedule(self, team: str, days: int = 7) -> str:
+        """Games in the next `days` days for a team name such as 'duke' or 'panthers'"""
+        result = await self.answer_batch([{'type': 'schedule', 'team': team, 'days': days}])
+        return result['answers'][0]
+
+    def leagues_for_team(self, team_id: int) -> List[Tuple[str, str]]:
+        """(sport, league) pairs a tracked team plays in"""
+        if team_id in self.college_teams:
+            return [("basketball", "mens-college-basketball"), ("football", "college-football")]
+        return [("football", "nfl")]
+
+    def schedule_window(self, days: int) -> str:
+        """ESPN `dates` value covering today (US Eastern) through `days` days from now"""
+        start = datetime.now(ESPN_TIMEZONE).date()
+        end = start + timedelta(days=max(int(days), 0))
+        return f"{start:%Y%m%d}-{end:%Y%m%d}"
+
+    def normalize_query(self, query: Any) -> Tuple[Optional[Dict], Optional[str]]:
+        """Validate and coerce one batch query, returning (query, None) or (None, error message)"""
+        if not isinstance(query, dict):
+            return None, f"Invalid query {query!r}: expected an object such as {{'type': 'live_scores', 'sport': 'nfl'}}."
+
+        query_type = query.get('type')
+        if query_type == 'live_scores':
+            sport = query.get('sport') or 'both'
+            if sport != 'both' and sport not in LEAGUES:
+                return None, f"Unknown sport '{sport}'. Use 'basketball', 'football', 'nfl' or 'both'."
+            return {'type': 'live_scores', 'sport': sport}, None
+
+        if query_type == 'schedule':
+            team = str(query.get('team') or '')
+            days = query.get('days')
+            if days is None:
+                days = 7
+            try:
+                if isinstance(days, bool):
+                    raise ValueError(days)
+                days = int(days)
+            except (TypeError, ValueError):
+                days = -1
+            if days < 0:
+                return None, f"Invalid days {query.get('days')!r} for '{team}' schedule: expected a whole number of days."
+            return {'type': 'schedule', 'team': team, 'days': days}, None
+
+        return None, f"Unknown query type '{query_type}'. Use 'live_scores' or 'schedule'."
+
+    def plan_fetches(self, query: Dict) -> List[FetchKey]:
+        """Scoreboard requests needed to answer one normalized query on its own"""
+        if query['type'] == 'live_scores':
+            return [
+                (espn_sport, league, None)
+                for option, (espn_sport, league, _) in LEAGUES.items()
+                if query['sport'] in [option, "both"]
+            ]
+        team_id = self.team_lookup.get(query['team'].lower())
+        if not team_id:
+            return []
+        dates = self.schedule_window(query['days'])
+        return [(sport, league, dates) for sport, league in self.leagues_for_team(team_id)]
+
+    async def answer_batch(self, queries: List[Dict]) -> Dict[str, Any]:
+        """
+        Answer several queries from one pass over the scoreboards they need.
+
+        Queries are {'type': 'live_scores', 'sport': ...} or
+        {'type': 'schedule', 'team': ..., 'days': ...}; invalid ones are
+        answered with an error message. Schedule queries for the same league
+        share one fetch of the widest window asked for, and each answer is
+        filtered back to its own days. Every distinct fetch runs once.
+
+        Returns {'answers', 'fetches', 'unbatched_fetches', 'fetches_saved'}.
+        """
+        if not isinstance(queries, list):
+            queries = [queries]
+        checked = [self.normalize_query(query) for query in queries]
+        plans = [self.plan_fetches(query) if query else [] for query, _ in checked]
+
+        # One window per league: the widest any schedule query needs (all start today)
+        widest: Dict[Tuple[str, str], str] = {}
+        for plan in plans:
+            for sport, league, dates in plan:
+                if dates and dates > widest.get((sport, league), ''):
+                    widest[(sport, league)] = dates
+        fetch_for = {
+            key: (key[0], key[1], widest[key[:2]]) if key[2] else key
+            for plan in plans for key in plan
+        }
+        keys = list(dict.fromkeys(fetch_for.values()))
+
+        results = await asyncio.gather(*(self.fetch_games(*key) for key in keys), return_exceptions=True)
+        games_by_key = {
+            key: [] if isinstance(games, BaseException) else games
+            for key, games in zip(keys, results)
+        }
+
+        answers = []
+        for (query, error), plan in zip(checked, plans):
+            if error:
+                answers.append(error)
+            else:
+                shared = {key: games_by_key[fetch_for[key]] for key in plan}
+                answers.append(self._answer(query, plan, shared, fetch_for))
+
+        unbatched = sum(len(plan) for plan in plans)
+        return {
+            'answers': answers,
+            'fetches': len(keys),
+            'unbatched_fetches': unbatched,
+            'fetches_saved': unbatched - len(keys),
+        }
+
+    def _answer(
+        self,
+        query: Dict,
+        plan: List[FetchKey],
+        games_by_key: Dict[FetchKey, List[Dict]],
+        fetch_for: Dict[FetchKey, FetchKey],
+    ) -> str:
+        if query['type'] == 'live_scores':
+            return self._answer_live_scores(query['sport'], plan, games_by_key)
+        # Games fetched for a wider window are cut back to this query's days
+        narrowed = {key for key in plan if fetch_for[key] != key}
+        return self._answer_schedule(query['team'], plan, games_by_key, narrowed)
+
+    def _in_window(self, game: Dict, dates: str) -> bool:
+        """Whether a game's US Eastern start date falls inside an ESPN `dates` window"""
+        start, end = dates.split('-')
+        try:
+            played = datetime.fromisoformat(game['date'].replace('Z', '+00:00')).astimezone(ESPN_TIMEZONE)
+        except (AttributeError, TypeError, ValueError):
+            return True
+        return start <= f"{played:%Y%m%d}" <= end
+
+    def _answer_live_scores(self, sport: str, plan: List[FetchKey], games_by_key: Dict[FetchKey, List[Dict]]) -> str:
+        try:
+            titles = {(espn_sport, league): title for espn_sport, league, title in LEAGUES.values()}
+            results = []
+
+            for key in plan:
+                games = games_by_key.get(key, [])
+                if games:
+                    results.append(f"{titles[key[:2]]}\n{self.render_games(games)}")
+
+            if not results:
+                return f"No games found for tracked teams in {sport} right now."
+
+            return "\n\n".join(results)
+
+        except Exception as e:
+            return f"Error fetching scores: {str(e)}"
+
+    def _answer_schedule(
+        self,
+        team: str,
+        plan: List[FetchKey],
+        games_by_key: Dict[FetchKey, List[Dict]],
+        narrowed: set,
+    ) -> str:
+        try:
+            team_id = self.team_lookup.get(str(team).lower())
+            if not team_id:
+                return f"Team '{team}' not found. Available: {', '.join(self.team_lookup.keys())}"
+
+            all_games = []
+            for key in plan:
+                sport, league, dates = key
+                for game in games_by_key.get(key, []):
+                    if key in narrowed and not self._in_window(game, dates):
+                        continue
+                    if (game['home_team']['id'] == str(team_id) or
+                        game['away_team']['id'] == str(team_id)):
+                        # Copy so the shared cached snapshot is left untouched
+                        all_games.append({**game, 'sport': sport, 'league': league})
+
+            return self.render_schedule(team_id, all_games)
+
+        except Exception as e:
+            return f"Error fetching schedule: {str(e)}"
+
+    def render_batch(self, result: Dict[str, Any]) -> str:
+        """Render an answer_batch result as one chat message"""
+        footer = (
+            f"_{result['fetches']} scoreboard fetches for {len(result['answers'])} questions "
+            f"({result['fetches_saved']} saved by batching)_"
+        )
+        return "\n\n---\n\n".join(result['answers'] + [footer])
+
+
 class Pipe:
     class Valves(BaseModel):
         MODEL_ID: str = Field(default="sports-tracker", description="Model identifier for the sports tracker")
+        SHARED_CACHE_ENABLED: bool = Field(default=True, description="Share scoreboards between Open WebUI workers")
+        SHARED_CACHE_PATH: str = Field(
+            default=os.path.join(tempfile.gettempdir(), "sports_tracker_cache.sqlite3"),
+            description="SQLite file holding the shared scoreboard cache"
+        )
+        SHARED_CACHE_TTL: int = Field(default=30, description="Seconds before a cached scoreboard is refreshed")
+        SCHEDULE_DAYS: int = Field(default=14, description="Days ahead covered by schedule questions")
+        WARMUP_ENABLED: bool = Field(default=True, description="Prefetch scoreboards and schedules when the function loads")
+        MEMORY_BUDGET_MB: int = Field(default=32, gt=0, description="Upper bound for all in-process caches, in MB")
         
     def __init__(self):
         self.type = "manifold"
@@ -23,31 +1128,11 @@ class Pipe:
         self.name = "Sports Score Tracker"
         self.valves = self.Valves()
         
-        # College teams
-        self.college_teams = {
-            150: "Duke Blue Devils",
-            153: "UNC Tar Heels", 
-            2579: "USC Gamecocks",
-            228: "Clemson Tigers"
-        }
-        
-        # NFL teams
-        self.nfl_teams = {
-            29: "Carolina Panthers",
-            30: "Jacksonville Jaguars", 
-            3: "Chicago Bears",
-            1: "Atlanta Falcons"
-        }
-        
-        # Combined teams for lookup
-        self.all_teams = {**self.college_teams, **self.nfl_teams}
-        
-        # Team name mappings
-        self.team_lookup = {
-            'duke': 150, 'unc': 153, 'usc': 2579, 'clemson': 228,
-            'panthers': 29, 'carolina': 29, 'jaguars': 30, 'jacksonville': 30,
-            'bears': 3, 'chicago': 3, 'falcons': 1, 'atlanta': 1
-        }
+        self.engine = ScoreEngine()
+        self.team_lookup = self.engine.team_lookup
+        self._cache: Optional[SharedScoreboardCache] = None
+        self._warmup_task: Optional[asyncio.Task] = None
+        self._start_warmup()
 
     def get_models(self):
         return [
@@ -64,6 +1149,9 @@ class Pipe:
         """
         Main pipe function that processes sports score requests
         """
+        if self._warmup_task is None:
+            self._start_warmup()
+
         try:
             # Extract the user's message
             messages = body.get("messages", [])
@@ -76,12 +1164,23 @@ class Pipe:
             # Determine what the user wants based on their message
             if any(word in last_message for word in ["help", "what can you do", "commands"]):
                 response = self._get_help()
+            elif "memory usage" in last_message:
+                self._get_cache()
+                response = self.engine.render_memory_stats()
             elif "teams" in last_message or "who do" in last_message or "track" in last_message:
                 response = self._get_team_info()
+            elif any(phrase in last_message for phrase in ["play by play", "play-by-play", "box score", "boxscore", "last plays"]):
+                teams = self._extract_teams_from_message(last_message)
+                if teams:
+                    response = await self._get_game_detail(teams[0])
+                else:
+                    response = "Please specify a team: duke, unc, usc, clemson, panthers, jaguars, bears, or falcons"
             elif "schedule" in last_message:
-                team = self._extract_team_from_message(last_message)
-                if team:
-                    response = await self._get_team_schedule(team)
+                teams = self._extract_teams_from_message(last_message)
+                if len(teams) > 1:
+                    response = await self._get_team_schedules(teams)
+                elif teams:
+                    response = await self._get_team_schedule(teams[0])
                 else:
                     response = "Please specify a team: duke, unc, usc, clemson, panthers, jaguars, bears, or falcons"
             elif "nfl" in last_message and "score" in last_message:
@@ -109,6 +1208,7 @@ class Pipe:
 I can help you with:
 • **Live Scores**: "Show me the latest scores" or "NFL scores"
 • **Team Schedules**: "When does Duke play next?" or "Panthers schedule"  
+• **Live Game Detail**: "Panthers play by play" or "Duke box score"
 • **Team Info**: "What teams do you track?"
 
 **Tracked Teams:**
@@ -117,24 +1217,17 @@ I can help you with:
 
 Just ask me naturally about any team or sport!"""
 
-    def _extract_team_from_message(self, content: str) -> Optional[str]:
-        """Extract team name from user message"""
-        for team_name in self.team_lookup.keys():
-            if team_name in content:
-                return team_name
-        return None
+    def _extract_teams_from_message(self, content: str) -> List[str]:
+        """Extract every distinct team mentioned in a user message"""
+        teams = {}
+        for team_name, team_id in self.team_lookup.items():
+            if team_name in content and team_id not in teams:
+                teams[team_id] = team_name
+        return list(teams.values())
 
     def _get_team_info(self) -> str:
         """Get information about tracked teams"""
-        output = ["🏀🏈 **TRACKED TEAMS** 🏈🏀\n"]
-        
-        output.append("**College Teams:**")
-        for team_id, team_name in self.college_teams.items():
-            output.append(f"• **{team_name}** - ID: {team_id}")
-        
-        output.append("\n**NFL Teams:**")
-        for team_id, team_name in self.nfl_teams.items():
-            output.append(f"• **{team_name}** - ID: {team_id}")
+        output = [self.engine.render_team_info()]
         
         output.append(f"\n**Usage Examples:**")
         output.append("• 'Show me NFL scores'")
@@ -145,192 +1238,63 @@ Just ask me naturally about any team or sport!"""
 
     async def _get_live_scores(self, sport: str = "both") -> str:
         """Get live scores for tracked teams"""
-        try:
-            results = []
-            
-            if sport in ["basketball", "both"]:
-                games = await self._fetch_games("basketball", "mens-college-basketball")
-                if games:
-                    results.append(f"🏀 **COLLEGE BASKETBALL** 🏀\n{self._format_games(games)}")
-            
-            if sport in ["football", "both"]:
-                games = await self._fetch_games("football", "college-football")
-                if games:
-                    results.append(f"🏈 **COLLEGE FOOTBALL** 🏈\n{self._format_games(games)}")
-            
-            if sport in ["nfl", "both"]:
-                games = await self._fetch_games("football", "nfl")
-                if games:
-                    results.append(f"🏈 **NFL** 🏈\n{self._format_games(games)}")
-            
-            if not results:
-                return f"No games found for tracked teams in {sport} right now."
-            
-            return "\n\n".join(results)
-            
-        except Exception as e:
-            return f"Error fetching scores: {str(e)}"
+        self.engine.cache = self._get_cache()
+        return await self.engine.live_scores(sport)
 
-    async def _get_team_schedule(self, team: str, days: int = 14) -> str:
+    async def _get_team_schedule(self, team: str, days: Optional[int] = None) -> str:
         """Get upcoming schedule for a specific team"""
-        try:
-            team_id = self.team_lookup.get(team.lower())
-            if not team_id:
-                return f"Team '{team}' not found. Available: {', '.join(self.team_lookup.keys())}"
-            
-            team_name = self.all_teams[team_id]
-            
-            # Determine which leagues to check
-            leagues = []
-            if team_id in self.college_teams:
-                leagues = [("basketball", "mens-college-basketball"), ("football", "college-football")]
-            else:
-                leagues = [("football", "nfl")]
-            
-            all_games = []
-            for sport, league in leagues:
-                games = await self._fetch_games(sport, league)
-                for game in games:
-                    if (game['home_team']['id'] == str(team_id) or 
-                        game['away_team']['id'] == str(team_id)):
-                        game['sport'] = sport
-                        all_games.append(game)
-            
-            if not all_games:
-                return f"No upcoming games found for {team_name}"
-            
-            output = [f"📅 **{team_name.upper()} SCHEDULE** 📅\n"]
-            for game in all_games:
-                sport_emoji = "🏀" if game['sport'] == "basketball" else "🏈"
-                home = game['home_team']
-                away = game['away_team']
-                
-                if home['id'] == str(team_id):
-                    opponent = f"vs {away['abbreviation']}"
-                    location = "Home"
-                else:
-                    opponent = f"@ {home['abbreviation']}"
-                    location = "Away"
-                
-                status = game['status'].get('short_detail', game['status'].get('detail', 'TBD'))
-                venue = game.get('venue', 'TBD')
-                broadcast = game.get('broadcast', '')
-                
-                game_line = f"{sport_emoji} **{opponent}** ({location})\n📅 {status}\n🏟️ {venue}"
-                if broadcast:
-                    game_line += f"\n📺 {broadcast}"
-                
-                output.append(game_line + "\n")
-            
-            return "\n".join(output)
-            
-        except Exception as e:
-            return f"Error fetching schedule: {str(e)}"
+        self.engine.cache = self._get_cache()
+        return await self.engine.team_schedule(team, days or self.valves.SCHEDULE_DAYS)
 
-    async def _fetch_games(self, sport: str, league: str) -> List[Dict]:
-        """Fetch games from ESPN API"""
-        url = f"https://site.api.espn.com/apis/site/v2/sports/{sport}/{league}/scoreboard"
-        
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._filter_team_games(data)
-                    return []
-        except Exception:
-            return []
+    async def _get_game_detail(self, team: str, plays: int = 10) -> str:
+        """Get box score and recent plays for a team's live game"""
+        self.engine.cache = self._get_cache()
+        return await self.engine.game_detail(team, plays)
 
-    def _filter_team_games(self, data: Dict) -> List[Dict]:
-        """Filter games for tracked teams"""
-        team_games = []
-        tracked_ids = set(str(tid) for tid in self.all_teams.keys())
-        
-        for event in data.get('events', []):
-            for competition in event.get('competitions', []):
-                competitors = competition.get('competitors', [])
-                
-                # Check if any tracked teams are playing
-                for competitor in competitors:
-                    if competitor['team']['id'] in tracked_ids:
-                        game_info = self._format_game_info(event, competition)
-                        if game_info:
-                            team_games.append(game_info)
-                        break
-        
-        return team_games
+    async def _get_team_schedules(self, teams: List[str], days: Optional[int] = None) -> str:
+        """Get schedules for several teams in one batch"""
+        self.engine.cache = self._get_cache()
+        days = days or self.valves.SCHEDULE_DAYS
+        queries = [{'type': 'schedule', 'team': team, 'days': days} for team in teams]
+        return self.engine.render_batch(await self.engine.answer_batch(queries))
 
-    def _format_game_info(self, event: Dict, competition: Dict) -> Optional[Dict]:
-        """Format game information"""
-        try:
-            status = event.get('status', {})
-            competitors = competition.get('competitors', [])
-            
-            if len(competitors) != 2:
-                return None
-                
-            home_team = next((c for c in competitors if c.get('homeAway') == 'home'), competitors[0])
-            away_team = next((c for c in competitors if c.get('homeAway') == 'away'), competitors[1])
-            
-            return {
-                'home_team': {
-                    'id': home_team['team']['id'],
-                    'name': home_team['team']['displayName'],
-                    'abbreviation': home_team['team']['abbreviation'],
-                    'score': home_team.get('score', '0')
-                },
-                'away_team': {
-                    'id': away_team['team']['id'],
-                    'name': away_team['team']['displayName'],
-                    'abbreviation': away_team['team']['abbreviation'],
-                    'score': away_team.get('score', '0')
-                },
-                'status': {
-                    'state': status.get('type', {}).get('state', 'Unknown'),
-                    'detail': status.get('type', {}).get('detail', ''),
-                    'short_detail': status.get('type', {}).get('shortDetail', '')
-                },
-                'venue': competition.get('venue', {}).get('fullName', ''),
-                'broadcast': ', '.join([b.get('names', [''])[0] for b in competition.get('broadcasts', [])])
-            }
-        except Exception:
+    def _get_cache(self) -> Optional[SharedScoreboardCache]:
+        """Return the shared cache for the current valves, or None when disabled"""
+        self.engine.ttl = self.valves.SHARED_CACHE_TTL
+        limit = self.valves.MEMORY_BUDGET_MB * 1024 * 1024
+        # Only on a valve change: every request comes through here
+        if limit != self.engine.budget.limit:
+            self.engine.budget.set_limit(limit)
+        if not self.valves.SHARED_CACHE_ENABLED:
             return None
+        if self._cache is None or self._cache.path != self.valves.SHARED_CACHE_PATH:
+            self._cache = SharedScoreboardCache(self.valves.SHARED_CACHE_PATH)
+            self._cache.attach_budget(self.engine.budget)
+        self._cache.ttl = self.valves.SHARED_CACHE_TTL
+        return self._cache
 
-    def _format_games(self, games: List[Dict]) -> str:
-        """Format games for display"""
-        if not games:
-            return "No games found."
-        
-        output = []
-        for game in games:
-            home = game['home_team']
-            away = game['away_team']
-            status = game['status']
-            
-            # Check if our teams are playing
-            our_teams = []
-            tracked_ids = set(str(tid) for tid in self.all_teams.keys())
-            if home['id'] in tracked_ids:
-                our_teams.append(home['abbreviation'])
-            if away['id'] in tracked_ids:
-                our_teams.append(away['abbreviation'])
-            
-            teams_indicator = f" 📍 {', '.join(our_teams)}" if our_teams else ""
-            
-            # Format score/matchup
-            if status['state'] in ['in', 'post']:
-                matchup = f"**{away['abbreviation']} {away['score']} - {home['score']} {home['abbreviation']}**"
-            else:
-                matchup = f"**{away['abbreviation']} @ {home['abbreviation']}**"
-            
-            status_text = status.get('short_detail') or status.get('detail', 'TBD')
-            venue = game.get('venue', 'TBD')
-            broadcast = game.get('broadcast', '')
-            
-            game_text = f"{matchup}{teams_indicator}\n📅 {status_text}\n🏟️ {venue}"
-            if broadcast:
-                game_text += f"\n📺 {broadcast}"
-            
-            output.append(game_text)
-        
-        return "\n\n".join(output)
\ No newline at end of file
+    def memory_stats(self) -> Dict[str, Any]:
+        """Memory gauges for the in-process caches and this worker's RSS"""
+        self._get_cache()
+        return self.engine.memory_stats()
+
+    def _start_warmup(self) -> None:
+        """Schedule the background warm-up if an event loop is running"""
+        self._warmup_task = self.engine.start_warm_up(
+            prepare=self._prepare_warmup,
+            # Turning WARMUP_ENABLED off in the valves stops a running warm-up
+            should_continue=lambda: self.valves.WARMUP_ENABLED,
+        )
+
+    def _prepare_warmup(self) -> Optional[int]:
+        # Valves are read when the task starts, not in __init__: Open WebUI builds
+        # the Pipe first and assigns the saved valves before the task gets to run
+        if not self.valves.WARMUP_ENABLED:
+            return None
+        self.engine.cache = self._get_cache()
+        return self.valves.SCHEDULE_DAYS
+
+    def cancel_warmup(self) -> None:
+        """Cancel the background warm-up if it is still running"""
+        if self._warmup_task is not None and not self._warmup_task.done():
+            self._warmup_task.cancel()
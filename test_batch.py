@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for answering many queries from one pass over the scoreboards
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from main import Tools
+from openwebui_function import ScoreEngine, Pipe
+
+
+def test_overlapping_queries_fetch_each_scoreboard_once(stub_scoreboards):
+    engine = ScoreEngine()
+    calls = stub_scoreboards(engine, delay=0.01)
+    queries = [
+        {'type': 'live_scores', 'sport': 'both'},
+        {'type': 'live_scores', 'sport': 'nfl'},
+        {'type': 'schedule', 'team': 'duke', 'days': 7},
+        {'type': 'schedule', 'team': 'clemson', 'days': 7},
+        {'type': 'schedule', 'team': 'panthers', 'days': 7},
+    ]
+    result = asyncio.run(engine.answer_batch(queries))
+
+    # 3 live leagues + college basketball/football and NFL schedule windows
+    assert result['fetches'] == 6
+    assert len(calls) == 6
+    assert result['unbatched_fetches'] == 3 + 1 + 2 + 2 + 1
+    assert result['fetches_saved'] == 3
+
+
+def test_batch_answers_match_single_queries(stub_scoreboards):
+    engine = ScoreEngine()
+    stub_scoreboards(engine)
+    queries = [
+        {'type': 'live_scores', 'sport': 'basketball'},
+        {'type': 'schedule', 'team': 'bears', 'days': 3},
+        {'type': 'schedule', 'team': 'nobody'},
+        {'type': 'standings'},
+    ]
+    answers = asyncio.run(engine.answer_batch(queries))['answers']
+
+    assert answers[0] == asyncio.run(engine.live_scores('basketball'))
+    assert answers[1] == asyncio.run(engine.team_schedule('bears', 3))
+    assert answers[2].startswith("Team 'nobody' not found")
+    assert answers[3].startswith("Unknown query type 'standings'")
+
+
+def test_concurrent_callers_share_inflight_fetch(stub_scoreboards):
+    engine = ScoreEngine()
+    calls = stub_scoreboards(engine, delay=0.01)
+
+    async def run():
+        return await asyncio.gather(*(engine.live_scores('nfl') for _ in range(5)))
+
+    answers = asyncio.run(run())
+    assert calls == [("football", "nfl", None)]
+    assert len(set(answers)) == 1
+
+
+def test_pipe_batches_multi_team_schedule(stub_scoreboards):
+    pipe = Pipe()
+    pipe.valves.SHARED_CACHE_ENABLED = False
+    pipe.valves.WARMUP_ENABLED = False
+    calls = stub_scoreboards(pipe.engine, delay=0.01)
+
+    async def collect():
+        body = {"messages": [{"role": "user", "content": "duke and clemson schedule"}]}
+        return [chunk async for chunk in pipe.pipe(body)]
+
+    response = asyncio.run(collect())[0]
+    assert "DUKE BLUE DEVILS SCHEDULE" in response
+    assert "CLEMSON TIGERS SCHEDULE" in response
+    assert "(2 saved by batching)" in response
+    assert len(calls) == 2
+
+
+def test_invalid_queries_are_answered_with_messages(stub_scoreboards):
+    tools = Tools()
+    calls = stub_scoreboards(tools.engine)
+    reply = asyncio.run(tools.get_batch({}, [
+        {'type': 'schedule', 'team': 'duke', 'days': None},
+        {'type': 'schedule', 'team': 'duke', 'days': 'seven'},
+        'nfl scores',
+        {'type': 'live_scores', 'sport': 'hockey'},
+    ]))
+
+    # days=None falls back to the default window; the rest are explained
+    assert "DUKE BLUE DEVILS SCHEDULE" in reply
+    assert "Invalid days 'seven' for 'duke' schedule" in reply
+    assert "Invalid query 'nfl scores'" in reply
+    assert "Unknown sport 'hockey'" in reply
+    assert len(calls) == 2
+
+
+def test_schedules_share_the_widest_window_per_league(load_scoreboard):
+    calls = []
+    engine = ScoreEngine()
+    now = datetime.now(timezone.utc).replace(hour=12, minute=0)
+
+    async def upcoming_scoreboard(sport, league, dates=None):
+        calls.append((sport, league, dates))
+        board = load_scoreboard(league)
+        # Duke hosts UNC in six days; Clemson plays tomorrow
+        for event, offset in zip(board['events'], [6, 1]):
+            event['date'] = f"{now + timedelta(days=offset):%Y-%m-%dT%H:%MZ}"
+        return board
+
+    engine.download_scoreboard = upcoming_scoreboard
+    result = asyncio.run(engine.answer_batch([
+        {'type': 'schedule', 'team': 'duke', 'days': 3},
+        {'type': 'schedule', 'team': 'clemson', 'days': 10},
+    ]))
+
+    assert result['fetches'] == 2
+    assert result['fetches_saved'] == 2
+    assert {dates for _, _, dates in calls} == {engine.schedule_window(10)}
+    # Duke's game is outside its own 3-day window even though it was fetched
+    assert result['answers'][0] == "No upcoming games found for Duke Blue Devils"
+    assert "@ NCSU" in result['answers'][1]
+
+
+def test_late_evening_eastern_game_on_last_day_matches_single_query(load_scoreboard, monkeypatch):
+    # A UTC host, as in the Docker image: the game below starts the next UTC day
+    monkeypatch.setenv('TZ', 'UTC')
+    time.tzset()
+    try:
+        eastern = ZoneInfo("America/New_York")
+        today = datetime.now(eastern).date()
+        kickoff = datetime(today.year, today.month, today.day, 20, 15, tzinfo=eastern) + timedelta(days=3)
+
+        async def upcoming_scoreboard(sport, league, dates=None):
+            board = load_scoreboard(league)
+            for event, offset in zip(board['events'], [0, 1]):
+                event['date'] = f"{kickoff.astimezone(timezone.utc) + timedelta(days=offset):%Y-%m-%dT%H:%MZ}"
+            return board
+
+        engine, single = ScoreEngine(), ScoreEngine()
+        engine.download_scoreboard = single.download_scoreboard = upcoming_scoreboard
+        assert engine.schedule_window(3) == f"{today:%Y%m%d}-{kickoff:%Y%m%d}"
+
+        batched = asyncio.run(engine.answer_batch([
+            {'type': 'schedule', 'team': 'duke', 'days': 3},
+            {'type': 'schedule', 'team': 'clemson', 'days': 10},
+        ]))
+        alone = asyncio.run(single.answer_batch([{'type': 'schedule', 'team': 'duke', 'days': 3}]))
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+    assert "vs UNC" in alone['answers'][0]
+    assert batched['answers'][0] == alone['answers'][0]
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Parity tests: the main.py Tools and the Open WebUI Pipe must answer the
+same questions identically, using recorded ESPN scoreboards in fixtures/
+"""
+
+import asyncio
+
+import pytest
+
+from main import Tools
+from openwebui_function import Pipe
+
+
+@pytest.fixture
+def entry_points(stub_scoreboards):
+    tools = Tools()
+    pipe = Pipe()
+    pipe.valves.SHARED_CACHE_ENABLED = False
+    pipe.valves.WARMUP_ENABLED = False
+    for engine in (tools.engine, pipe.engine):
+        stub_scoreboards(engine)
+    return tools, pipe
+
+
+def test_entry_points_share_one_engine_class(entry_points):
+    tools, pipe = entry_points
+    assert type(tools.engine) is type(pipe.engine)
+
+
+def test_live_scores_parity(entry_points):
+    tools, pipe = entry_points
+    for sport in ["basketball", "football", "nfl", "both"]:
+        from_tools = asyncio.run(tools.get_live_scores({}, sport))
+        from_pipe = asyncio.run(pipe._get_live_scores(sport))
+        assert from_tools == from_pipe
+    assert "**CAR 14 - 17 JAX** 📍 JAX, CAR" in from_tools
+    # Untracked games are filtered out
+    assert "DAL" not in from_tools
+
+
+def test_team_schedule_parity(entry_points):
+    tools, pipe = entry_points
+    for team in ["duke", "clemson", "panthers", "bears", "falcons", "nobody"]:
+        from_tools = asyncio.run(tools.get_team_schedule({}, team, 7))
+        from_pipe = asyncio.run(pipe._get_team_schedule(team, 7))
+        assert from_tools == from_pipe
+
+
+def test_schedule_is_sorted_and_labelled(entry_points):
+    tools, _ = entry_points
+    schedule = asyncio.run(tools.get_team_schedule({}, "clemson"))
+    # Saturday's football game comes before Sunday's basketball game
+    assert schedule.index("@ SC") < schedule.index("@ NCSU")
+    assert "(Away) (College)" in schedule
+
+
+def test_team_info_parity(entry_points):
+    tools, pipe = entry_points
+    team_list = tools.engine.render_team_info()
+    assert asyncio.run(tools.get_team_info({}, "all")).startswith(team_list)
+    assert pipe._get_team_info().startswith(team_list)
+
+
+def test_pipe_routes_through_engine(entry_points):
+    _, pipe = entry_points
+
+    async def collect():
+        body = {"messages": [{"role": "user", "content": "NFL scores please"}]}
+        return [chunk async for chunk in pipe.pipe(body)]
+
+    assert asyncio.run(collect()) == [asyncio.run(pipe.engine.live_scores("nfl"))]
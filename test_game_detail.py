@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for live game detail with incremental play-by-play
+"""
+
+import asyncio
+import copy
+import json
+
+import pytest
+
+from main import Tools
+from openwebui_function import MAX_STORED_PLAYS
+
+
+@pytest.fixture
+def load_summary(read_fixture):
+    return lambda: json.loads(read_fixture("nfl_summary.json"))
+
+
+@pytest.fixture
+def make_tools(stub_scoreboards):
+    def make(summaries, calls):
+        tools = Tools()
+        stub_scoreboards(tools.engine)
+
+        async def recorded_summary(sport, league, event_id):
+            calls.append(event_id)
+            return summaries[min(len(calls), len(summaries)) - 1]
+
+        tools.engine.download_summary = recorded_summary
+        return tools
+
+    return make
+
+
+def add_play(summary, sequence, text, away, home):
+    play = {
+        "id": f"play-{sequence}", "sequenceNumber": str(sequence), "text": text,
+        "awayScore": away, "homeScore": home, "scoringPlay": False,
+        "period": {"number": 3, "displayValue": "3rd Quarter"}, "clock": {"displayValue": "9:50"},
+    }
+    summary["drives"]["current"]["plays"].append(play)
+    summary["drives"]["previous"][-1] = summary["drives"]["current"]
+
+
+def test_detail_shows_box_score_and_last_plays(make_tools, load_summary):
+    calls = []
+    tools = make_tools([load_summary()], calls)
+    detail = asyncio.run(tools.get_game_detail({}, "panthers", 3))
+
+    assert calls == ["401772001"]
+    assert detail.startswith("📋 **CAR 14 - 17 JAX** (10:21 - 3rd)")
+    assert "• **JAX**: 1st Downs 14 · Total Yards 288" in detail
+    assert "**Last 3 Plays**" in detail
+    # Newest play first; the current drive is not counted twice
+    assert detail.index("C.Hubbard up the middle") < detail.index("L.Cooke punts")
+    assert detail.count("C.Hubbard up the middle") == 1
+
+
+def test_only_new_plays_are_parsed(make_tools, load_summary):
+    first = load_summary()
+    second = copy.deepcopy(first)
+    add_play(second, 999900, "C.Hubbard right end to CAR 30 for 4 yards", 14, 17)
+    add_play(second, 999901, "B.Young sacked at CAR 22 for -8 yards", 14, 17)
+
+    calls = []
+    tools = make_tools([first, second], calls)
+    engine = tools.engine
+
+    async def run():
+        detail = await engine.fetch_game_detail("football", "nfl", "401772001")
+        initial = detail['plays_parsed']
+        detail['fetched_at'] = 0
+        await engine.fetch_game_detail("football", "nfl", "401772001")
+        return detail, initial
+
+    detail, initial = asyncio.run(run())
+    assert initial == 8
+    assert detail['plays_parsed'] == 10
+    assert detail['cursor'] == 999901
+    assert [play['text'] for play in detail['plays']][-2:] == [
+        "C.Hubbard right end to CAR 30 for 4 yards",
+        "B.Young sacked at CAR 22 for -8 yards",
+    ]
+
+
+def test_recent_plays_served_from_memory(make_tools, load_summary):
+    calls = []
+    tools = make_tools([load_summary()], calls)
+
+    async def run():
+        first = await tools.get_game_detail({}, "panthers", 5)
+        second = await tools.get_game_detail({}, "jaguars", 2)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert calls == ["401772001"]
+    assert "**Last 5 Plays**" in first
+    assert "**Last 2 Plays**" in second
+
+
+def test_no_live_game(make_tools, load_summary):
+    tools = make_tools([load_summary()], [])
+    assert asyncio.run(tools.get_game_detail({}, "duke")) == "No Duke Blue Devils game in progress right now."
+    assert asyncio.run(tools.get_game_detail({}, "nobody")).startswith("Team 'nobody' not found")
+
+
+def test_first_view_parses_only_plays_it_keeps(make_tools, load_summary):
+    summary = load_summary()
+    for sequence in range(1000000, 1000000 + MAX_STORED_PLAYS + 50):
+        add_play(summary, sequence, f"Play {sequence}", 14, 17)
+    tools = make_tools([summary], [])
+
+    detail = asyncio.run(tools.engine.fetch_game_detail("football", "nfl", "401772001"))
+
+    assert detail['plays_parsed'] == MAX_STORED_PLAYS
+    assert detail['cursor'] == 1000000 + MAX_STORED_PLAYS + 49
+    assert detail['plays'][0]['text'] == "Play 1000050"
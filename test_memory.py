@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Tests for memory-bounded caching: payload trimming, size-aware eviction and
+a soak test replaying live polling.
+
+The soak length defaults to a quick run; set SOAK_ITERATIONS (e.g. 100000,
+roughly hours of 15s polling) for a long one.
+"""
+
+import asyncio
+import copy
+import gc
+import json
+import os
+import tracemalloc
+
+import pytest
+
+from openwebui_function import (
+    SCOREBOARD_FIELDS, SUMMARY_FIELDS, MemoryBudget, Pipe, ScoreEngine, approx_size, current_rss,
+)
+
+SOAK_ITERATIONS = int(os.environ.get("SOAK_ITERATIONS", "300"))
+
+
+def test_trimmed_scoreboard_parses_the_same(read_fixture):
+    engine = ScoreEngine()
+    for league in ["nfl", "mens-college-basketball", "college-football"]:
+        text = read_fixture(f"{league}_scoreboard.json")
+        full = json.loads(text)
+        trimmed = engine.decode_payload(text, SCOREBOARD_FIELDS)
+
+        assert engine.filter_team_games(trimmed) == engine.filter_team_games(full)
+        assert approx_size(trimmed) < approx_size(full) / 2
+
+
+def test_trimmed_summary_parses_the_same(read_fixture):
+    engine = ScoreEngine()
+    text = read_fixture("nfl_summary.json")
+    full = json.loads(text)
+    trimmed = engine.decode_payload(text, SUMMARY_FIELDS)
+
+    assert engine.format_boxscore(trimmed) == engine.format_boxscore(full)
+    from_full = {'cursor': -1, 'plays': [], 'plays_parsed': 0}
+    from_trimmed = copy.deepcopy(from_full)
+    engine.parse_new_plays(from_full, full)
+    engine.parse_new_plays(from_trimmed, trimmed)
+    assert from_trimmed == from_full
+    assert approx_size(trimmed) < approx_size(full) / 2
+
+
+def test_budget_evicts_least_recently_used_across_caches():
+    first, second = {}, {}
+    budget = MemoryBudget(limit=approx_size("x" * 1000) * 2 + 100)
+    budget.register('first', first)
+    budget.register('second', second)
+
+    for store, name, key in [(first, 'first', 'a'), (second, 'second', 'b')]:
+        store[key] = "x" * 1000
+        budget.track(name, key, store[key])
+    budget.touch('first', 'a')
+    first['c'] = "y" * 1000
+    budget.track('first', 'c', first['c'])
+
+    # 'b' was least recently used, even though it lives in another cache
+    assert second == {}
+    assert set(first) == {'a', 'c'}
+    assert budget.evictions == 1
+    assert budget.used <= budget.limit
+
+
+def test_pipe_memory_valve_and_gauges():
+    pipe = Pipe()
+    pipe.valves = pipe.Valves(SHARED_CACHE_ENABLED=False, WARMUP_ENABLED=False, MEMORY_BUDGET_MB=4)
+    stats = pipe.memory_stats()
+
+    assert stats['budget_bytes'] == 4 * 1024 * 1024
+    assert {'snapshots', 'details'} <= set(stats['caches'])
+    assert stats['used_bytes'] == 0
+
+
+class ReplayedFeed:
+    """Serves recorded ESPN payloads with scores, events and plays moving on each poll"""
+
+    def __init__(self, load_scoreboard, read_fixture):
+        self.scoreboards = {league: load_scoreboard(league) for league in
+                            ["nfl", "mens-college-basketball", "college-football"]}
+        self.summary = json.loads(read_fixture("nfl_summary.json"))
+        self.template_play = self.summary["drives"]["current"]["plays"][0]
+        self.poll = 0
+
+    async def fetch_text(self, url, params=None):
+        league = url.split("/")[-2]
+        if url.endswith("/summary"):
+            return self._summary_text()
+        board = self.scoreboards[league]
+        event = board["events"][0]
+        # A new game every 50 polls, so finished games' details must be evicted
+        event["id"] = f"4017{self.poll // 50:06d}"
+        competitors = event["competitions"][0]["competitors"]
+        competitors[0]["score"] = str(self.poll % 60)
+        return json.dumps(board)
+
+    def _summary_text(self):
+        # The latest 20 plays, with sequence numbers that keep increasing
+        plays = []
+        for sequence in range(self.poll * 3, self.poll * 3 + 20):
+            play = dict(self.template_play, sequenceNumber=str(sequence), id=f"play-{sequence}",
+                        text=f"Play {sequence} for {sequence % 40} yards")
+            plays.append(play)
+        drive = dict(self.summary["drives"]["current"], plays=plays)
+        return json.dumps(dict(self.summary, drives={"current": drive, "previous": [drive]}))
+
+
+def test_soak_replayed_polling_stays_flat(load_scoreboard, read_fixture):
+    budget = 256 * 1024
+    engine = ScoreEngine(ttl=0, memory_budget=budget)
+    engine.detail_ttl = 0
+    feed = ReplayedFeed(load_scoreboard, read_fixture)
+    engine.fetch_text = feed.fetch_text
+
+    async def poll():
+        await engine.live_scores("both")
+        # Every schedule length is a new fetch key
+        await engine.team_schedule("clemson", feed.poll % 90)
+        await engine.game_detail("panthers", 10)
+
+    async def run():
+        warm_up = max(SOAK_ITERATIONS // 5, 50)
+        baseline = None
+        for feed.poll in range(SOAK_ITERATIONS):
+            await poll()
+            assert engine.budget.used <= budget
+            if feed.poll == warm_up:
+                gc.collect()
+                baseline = (tracemalloc.get_traced_memory()[0], current_rss())
+        gc.collect()
+        return baseline, (tracemalloc.get_traced_memory()[0], current_rss())
+
+    tracemalloc.start()
+    try:
+        (traced_start, rss_start), (traced_end, rss_end) = asyncio.run(run())
+    finally:
+        tracemalloc.stop()
+
+    assert engine.budget.evictions > 0
+    assert len(engine._details) < SOAK_ITERATIONS // 50
+    # Python heap and RSS stay flat once the caches are full
+    assert traced_end - traced_start < 256 * 1024
+    if rss_start is not None:
+        assert rss_end - rss_start < 8 * 1024 * 1024
+
+
+def test_entry_larger_than_budget_is_kept_until_replaced():
+    store = {}
+    budget = MemoryBudget(limit=100)
+    budget.register('details', store)
+
+    store['game'] = "x" * 1000
+    budget.track('details', 'game', store['game'])
+    # Re-measuring the same entry after it grows keeps it too
+    store['game'] += "y"
+    budget.track('details', 'game', store['game'])
+    assert 'game' in store
+
+    store['next'] = "z" * 1000
+    budget.track('details', 'next', store['next'])
+    assert set(store) == {'next'}
+    assert budget.evictions == 1
+
+
+def test_lowering_budget_keeps_most_recent_entry():
+    store = {}
+    budget = MemoryBudget(limit=10_000)
+    budget.register('details', store)
+    for key in ['old', 'live']:
+        store[key] = "x" * 1000
+        budget.track('details', key, store[key])
+
+    budget.set_limit(100)
+    assert set(store) == {'live'}
+
+
+def test_pipe_applies_memory_budget_only_when_valve_changes():
+    pipe = Pipe()
+    pipe.valves = pipe.Valves(SHARED_CACHE_ENABLED=False, WARMUP_ENABLED=False, MEMORY_BUDGET_MB=1)
+    limits = []
+    set_limit = pipe.engine.budget.set_limit
+    pipe.engine.budget.set_limit = lambda limit: (limits.append(limit), set_limit(limit))
+
+    for _ in range(3):
+        pipe._get_cache()
+    pipe.valves = pipe.Valves(SHARED_CACHE_ENABLED=False, WARMUP_ENABLED=False, MEMORY_BUDGET_MB=2)
+    pipe._get_cache()
+
+    assert limits == [1024 * 1024, 2 * 1024 * 1024]
+
+
+def test_memory_budget_valve_must_be_positive():
+    for value in [0, -1]:
+        with pytest.raises(ValueError):
+            Pipe.Valves(MEMORY_BUDGET_MB=value)
+
+
+def test_small_budget_keeps_live_game_cursor(read_fixture):
+    engine = ScoreEngine(memory_budget=1024)
+    engine.detail_ttl = 0
+    summary = engine.decode_payload(read_fixture("nfl_summary.json"), SUMMARY_FIELDS)
+
+    async def recorded_summary(sport, league, event_id):
+        return summary
+
+    engine.download_summary = recorded_summary
+
+    async def run():
+        first = await engine.fetch_game_detail("football", "nfl", "401772001")
+        second = await engine.fetch_game_detail("football", "nfl", "401772001")
+        return first, second
+
+    first, second = asyncio.run(run())
+    # The detail outgrows the budget but stays stored, so the refresh found
+    # no new plays instead of parsing the whole game again
+    assert "401772001" in engine._details
+    assert second is first
+    assert second['plays_parsed'] == 8
+
+
+def test_memory_route_needs_the_specific_phrase(stub_scoreboards):
+    pipe = Pipe()
+    pipe.valves = pipe.Valves(SHARED_CACHE_ENABLED=False, WARMUP_ENABLED=False)
+    stub_scoreboards(pipe.engine)
+
+    async def ask(content):
+        body = {"messages": [{"role": "user", "content": content}]}
+        return [chunk async for chunk in pipe.pipe(body)][0]
+
+    assert asyncio.run(ask("Show memory usage")).startswith("🧠 **MEMORY** 🧠")
+    assert asyncio.run(ask("From memory, what was the NFL score?")).startswith("🏈 **NFL** 🏈")
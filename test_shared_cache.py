@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Tests for the cross-process scoreboard cache used by the Open WebUI pipe
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+
+from openwebui_function import SNAPSHOT_RETENTION_TTLS, SharedScoreboardCache
+
+GAMES = [{'id': '401', 'home_team': {'id': '150', 'score': '70'}, 'away_team': {'id': '153', 'score': '68'}}]
+
+
+def _worker(db_path, log_path, start, results):
+    """Run one cache read in its own process, logging every real fetch"""
+
+    async def fetch(sport, league, dates=None):
+        with open(log_path, 'a') as log:
+            log.write(f"{os.getpid()}\n")
+        await asyncio.sleep(0.5)
+        return GAMES
+
+    cache = SharedScoreboardCache(db_path, ttl=60, wait=10)
+    start.wait()
+    games = asyncio.run(cache.get("basketball", "mens-college-basketball", fetch))
+    results.put(games)
+
+
+def test_one_refresher_across_processes(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite3")
+    log_path = str(tmp_path / "fetches.log")
+    ctx = multiprocessing.get_context("spawn")
+    start = ctx.Event()
+    results = ctx.Queue()
+
+    workers = [ctx.Process(target=_worker, args=(db_path, log_path, start, results)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    start.set()
+    answers = [results.get(timeout=30) for _ in workers]
+    for worker in workers:
+        worker.join(timeout=30)
+        assert worker.exitcode == 0
+
+    with open(log_path) as log:
+        fetches = log.read().split()
+    assert len(fetches) == 1
+    assert all(answer == GAMES for answer in answers)
+
+
+def test_fresh_snapshot_is_not_refetched(tmp_path):
+    calls = []
+
+    async def fetch(sport, league, dates=None):
+        calls.append((sport, league))
+        return GAMES
+
+    async def run():
+        writer = SharedScoreboardCache(str(tmp_path / "cache.sqlite3"), ttl=60)
+        reader = SharedScoreboardCache(str(tmp_path / "cache.sqlite3"), ttl=60)
+        await writer.get("football", "nfl", fetch)
+        first = await reader.get("football", "nfl", fetch)
+        second = await reader.get("football", "nfl", fetch)
+        return reader, first, second
+
+    reader, first, second = asyncio.run(run())
+    assert calls == [("football", "nfl")]
+    assert first == GAMES
+    # Unchanged snapshots are reused rather than decoded again
+    assert first is second
+    assert reader.stats['hits'] == 2
+
+
+def test_failed_fetch_keeps_previous_snapshot(tmp_path):
+    async def ok(sport, league, dates=None):
+        return GAMES
+
+    async def broken(sport, league, dates=None):
+        return None
+
+    async def run():
+        cache = SharedScoreboardCache(str(tmp_path / "cache.sqlite3"), ttl=0)
+        await cache.get("football", "nfl", ok)
+        time.sleep(0.01)
+        return await cache.get("football", "nfl", broken)
+
+    assert asyncio.run(run()) == GAMES
+
+
+def test_lease_is_exclusive_within_one_process(tmp_path):
+    calls = []
+
+    async def fetch(sport, league, dates=None):
+        calls.append(sport)
+        await asyncio.sleep(0.2)
+        return GAMES
+
+    async def run():
+        cache = SharedScoreboardCache(str(tmp_path / "cache.sqlite3"), ttl=60)
+        return await asyncio.gather(*(cache.get("football", "nfl", fetch) for _ in range(3)))
+
+    answers = asyncio.run(run())
+    assert calls == ["football"]
+    assert all(answer == GAMES for answer in answers)
+
+
+def test_failed_refresh_does_not_stampede(tmp_path):
+    calls = []
+
+    async def broken(sport, league, dates=None):
+        calls.append("refresher")
+        await asyncio.sleep(0.2)
+        return None
+
+    async def fetch(sport, league, dates=None):
+        calls.append("waiter")
+        return GAMES
+
+    async def run():
+        refresher = SharedScoreboardCache(str(tmp_path / "cache.sqlite3"), ttl=60)
+        waiters = [SharedScoreboardCache(str(tmp_path / "cache.sqlite3"), ttl=60) for _ in range(3)]
+
+        async def wait_then_get(cache):
+            await asyncio.sleep(0.05)
+            return await cache.get("football", "nfl", fetch)
+
+        started = time.time()
+        answers = await asyncio.gather(
+            refresher.get("football", "nfl", broken),
+            *(wait_then_get(cache) for cache in waiters),
+        )
+        # A retry inside the back-off window is refused as well
+        answers.append(await waiters[0].get("football", "nfl", fetch))
+        return answers, time.time() - started
+
+    answers, elapsed = asyncio.run(run())
+    assert calls == ["refresher"]
+    assert answers == [[]] * 5
+    # Waiters give up as soon as the failure is recorded, not after the 5s wait
+    assert elapsed < 2
+
+
+def test_write_prunes_snapshots_nobody_refreshes(tmp_path):
+    async def fetch(sport, league, dates=None):
+        return GAMES
+
+    async def run():
+        cache = SharedScoreboardCache(str(tmp_path / "cache.sqlite3"), ttl=60)
+        await cache.get("football", "nfl", fetch, "20261001-20261008")
+        await cache.get("football", "nfl", fetch, "20261018-20261025")
+        # The October 1st window was last refreshed well past the retention period
+        cache._connect().execute(
+            "UPDATE snapshots SET fetched_at = ? WHERE key = ?",
+            (time.time() - 60 * SNAPSHOT_RETENTION_TTLS - 1, "football/nfl/20261001-20261008"),
+        )
+        await cache.get("football", "nfl", fetch)
+        return cache
+
+    cache = asyncio.run(run())
+    keys = [row[0] for row in cache._connect().execute("SELECT key FROM snapshots ORDER BY key")]
+    assert keys == ["football/nfl", "football/nfl/20261018-20261025"]
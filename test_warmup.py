@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for the background warm-up run when the plugin loads
+"""
+
+import asyncio
+
+from openwebui_function import Pipe, ScoreEngine
+
+
+def test_warm_up_serves_first_requests_from_memory(stub_scoreboards):
+    engine = ScoreEngine()
+    calls = stub_scoreboards(engine)
+
+    async def run():
+        await engine.warm_up(schedule_days=7)
+        warmed = len(calls)
+        await engine.live_scores("both")
+        await engine.team_schedule("duke", 7)
+        await engine.team_schedule("panthers", 7)
+        return warmed
+
+    assert asyncio.run(run()) == 6
+    assert len(calls) == 6
+
+
+def test_warm_up_puts_live_leagues_first(stub_scoreboards, load_scoreboard):
+    engine = ScoreEngine()
+    stub_scoreboards(engine)
+    # A stale NFL snapshot from before the restart shows a game in progress
+    nfl_games = engine.filter_team_games(load_scoreboard("nfl"))
+    engine._snapshots[("football", "nfl", None)] = (0, nfl_games)
+
+    warmed = asyncio.run(engine.warm_up(schedule_days=7))
+
+    assert [key[:2] for key in warmed[:3]] == [
+        ("football", "nfl"),
+        ("basketball", "mens-college-basketball"),
+        ("football", "college-football"),
+    ]
+    # College football has only finished games today, so its schedule comes last
+    assert warmed[-1][:2] == ("football", "college-football")
+
+
+def test_pipe_warm_up_uses_valves_assigned_after_construction(stub_scoreboards, tmp_path):
+    custom_path = tmp_path / "custom.sqlite3"
+
+    async def run():
+        # Open WebUI constructs the Pipe, then assigns the saved valves
+        pipe = Pipe()
+        calls = stub_scoreboards(pipe.engine)
+        pipe.valves = pipe.Valves(SHARED_CACHE_ENABLED=False, SHARED_CACHE_PATH=str(custom_path), MEMORY_BUDGET_MB=1)
+        await pipe._warmup_task
+        return pipe, calls
+
+    pipe, calls = asyncio.run(run())
+    assert len(calls) == 6
+    assert pipe.engine.cache is None
+    assert not custom_path.exists()
+    assert pipe.engine.budget.limit == 1024 * 1024
+
+
+def test_pipe_warm_up_fills_configured_shared_cache(stub_scoreboards, tmp_path):
+    custom_path = tmp_path / "custom.sqlite3"
+
+    async def run():
+        pipe = Pipe()
+        stub_scoreboards(pipe.engine)
+        pipe.valves = pipe.Valves(SHARED_CACHE_PATH=str(custom_path))
+        await pipe._warmup_task
+        return pipe
+
+    pipe = asyncio.run(run())
+    assert pipe.engine.cache.path == str(custom_path)
+    assert pipe.engine.cache.peek("football", "nfl") is not None
+
+
+def test_pipe_warm_up_is_cancellable_through_valves(stub_scoreboards):
+    async def run():
+        pipe = Pipe()
+        pipe.valves = pipe.Valves(SHARED_CACHE_ENABLED=False)
+        calls = stub_scoreboards(pipe.engine, delay=0.05)
+        assert pipe._warmup_task is not None
+
+        await asyncio.sleep(0.01)
+        pipe.valves = pipe.Valves(SHARED_CACHE_ENABLED=False, WARMUP_ENABLED=False)
+        await pipe._warmup_task
+        return calls
+
+    # Only the fetch already under way when the valve flipped was made
+    assert len(asyncio.run(run())) == 1
+
+
+def test_pipe_warm_up_disabled_by_saved_valves(stub_scoreboards):
+    async def run():
+        pipe = Pipe()
+        calls = stub_scoreboards(pipe.engine)
+        pipe.valves = pipe.Valves(SHARED_CACHE_ENABLED=False, WARMUP_ENABLED=False)
+        await pipe._warmup_task
+        return calls
+
+    assert asyncio.run(run()) == []
+
+
+def test_pipe_cancel_warmup(stub_scoreboards):
+    async def run():
+        pipe = Pipe()
+        pipe.valves = pipe.Valves(SHARED_CACHE_ENABLED=False)
+        stub_scoreboards(pipe.engine, delay=1)
+        await asyncio.sleep(0.01)
+        pipe.cancel_warmup()
+        await asyncio.sleep(0)
+        return pipe._warmup_task.cancelled()
+
+    assert asyncio.run(run())
+
+
+def test_no_warm_up_without_running_loop():
+    assert Pipe()._warmup_task is None